@@ -2,13 +2,22 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from datetime import datetime, timezone
 from data.interfaces.blob import (
-    get_adlfs_path, 
-    get_storage_options, 
+    get_adlfs_path,
+    get_storage_options,
+    check_directory_exists,
     check_exists,
-    get_file_client
+    delete_file,
+    get_file_client,
+    invalidate_listing,
+    list_files,
+    list_files_cached,
+    mark_exists,
+    upload_async
 )
 import polars as pl
+import atexit
 import logging
+import time
 import uuid
 from io import BytesIO
 
@@ -23,37 +32,66 @@ class EntityBase(ABC):
     """
     
     REQUIRED_FIELDS = {
-        "Id": pl.Utf8,
-        "InstanceId": pl.Utf8,
+        # UUIDs are stored as their raw 16 bytes rather than 36-char
+        # strings: smaller ID columns and cheaper equality comparisons.
+        # Convert with bytes.hex() / bytes.fromhex() at the HTTP boundary.
+        "Id": pl.Binary,
+        "InstanceId": pl.Binary,
         "CreatedDate": pl.Datetime("us", "UTC"),
         "IsCurrent": pl.Boolean
     }
-    
-    def __init__(self):
+
+    # Buffered-writer thresholds: flush once this many records are pending,
+    # or once the oldest pending record is this old
+    BATCH_SIZE = 64
+    FLUSH_AFTER_SECONDS = 5.0
+
+    # Validated schema per subclass, so repeated instantiation on the hot
+    # path doesn't redo validation and dict construction
+    _SCHEMA_CACHE: Dict[type, Dict[str, pl.DataType]] = {}
+
+    def __init__(self, buffer_writes: bool = False):
         """
         Initialize entity with storage location.
         Schema is automatically constructed from REQUIRED_FIELDS + additional_schema.
-        
+
         Args:
-            storage_path: Path to folder containing parquet files
-        
+            buffer_writes: If True, created records accumulate in memory and
+                are uploaded as one part file when BATCH_SIZE records are
+                pending, FLUSH_AFTER_SECONDS has elapsed, or flush() is
+                called. Buffered records are not visible to reads until
+                flushed, so call flush() before returning a response.
+
         Raises:
             ValueError: If additional_schema contains reserved field names
         """
         self.storage_path = get_adlfs_path()
-        self.file_path = f"{self.entity_name}/{self.entity_name}.parquet"
-        self.full_url = f"{self.storage_path}{self.file_path}"
-        
-        # Validate that additional_schema doesn't use reserved names
-        additional = self.additional_schema
-        reserved_conflicts = set(additional.keys()) & set(self.REQUIRED_FIELDS.keys())
-        if reserved_conflicts:
-            raise ValueError(
-                f"additional_schema cannot use reserved field names: {reserved_conflicts}"
-            )
+        self.directory_path = self.entity_name
+        # Materialized view holding only the current version of each
+        # instance; underscore prefix keeps it out of the part-file scan
+        self.current_view_path = f"{self.entity_name}/_current.parquet"
         
-        # Construct full schema: required fields first, then additional fields
-        self.schema = {**self.REQUIRED_FIELDS, **additional}
+        cls = type(self)
+        if cls not in EntityBase._SCHEMA_CACHE:
+            # Validate that additional_schema doesn't use reserved names
+            additional = self.additional_schema
+            reserved_conflicts = set(additional.keys()) & set(self.REQUIRED_FIELDS.keys())
+            if reserved_conflicts:
+                raise ValueError(
+                    f"additional_schema cannot use reserved field names: {reserved_conflicts}"
+                )
+
+            # Construct full schema: required fields first, then additional fields
+            EntityBase._SCHEMA_CACHE[cls] = {**self.REQUIRED_FIELDS, **additional}
+
+        self.schema = EntityBase._SCHEMA_CACHE[cls]
+
+        self.buffer_writes = buffer_writes
+        self._pending = []
+        self._pending_since: Optional[float] = None
+        if buffer_writes:
+            # Don't lose buffered records if the worker is torn down
+            atexit.register(self.flush)
     
     @property
     @abstractmethod
@@ -78,27 +116,57 @@ class EntityBase(ABC):
     def load_all(self) -> pl.LazyFrame:
         """
         Load all records (including historical versions) as a LazyFrame.
-        
+
+        Each mutation is stored as its own part file, so the stored IsCurrent
+        flag of a version can be stale once a newer version exists. IsCurrent
+        is therefore resolved at scan time: the version with the latest
+        CreatedDate per InstanceId is current.
+
         Returns:
             LazyFrame containing all records, or empty LazyFrame if no data exists
         """
-        if not check_exists(self.file_path):
+        if not check_directory_exists(self.directory_path):
             # Return empty LazyFrame with correct schema
             logging.info(f"No data found for entity '{self.entity_name}'. Returning empty LazyFrame.")
             return pl.LazyFrame(schema=self.schema)
-        
-        return pl.scan_parquet(self.full_url, storage_options=get_storage_options())
+
+        # Scanning an explicit (cached) file list saves a remote LIST
+        # request per query; our own writes invalidate the cached listing
+        part_urls = [
+            f"{self.storage_path}{path}"
+            for path in list_files_cached(self.directory_path)
+            if self._is_part_file(path)
+        ]
+        if not part_urls:
+            return pl.LazyFrame(schema=self.schema)
+
+        return (
+            pl.scan_parquet(part_urls, storage_options=get_storage_options())
+            .with_columns(
+                (pl.col("CreatedDate") == pl.col("CreatedDate").max().over("InstanceId"))
+                .alias("IsCurrent")
+            )
+        )
     
     def load_current(self) -> pl.LazyFrame:
         """
         Load only current records (IsCurrent = True) as a LazyFrame.
-        
+
+        Reads the materialized _current.parquet view when one exists, so no
+        historical rows are scanned or filtered; falls back to filtering
+        the full history otherwise.
+
         Returns:
             LazyFrame containing only current records
         """
-        return self.load_all().filter(pl.col("IsCurrent") == True)
+        if check_exists(self.current_view_path):
+            return pl.scan_parquet(
+                f"{self.storage_path}{self.current_view_path}",
+                storage_options=get_storage_options()
+            )
+        return self.load_all().filter(pl.col("IsCurrent"))
     
-    def create(self, data: Dict[str, Any]) -> str:
+    def create(self, data: Dict[str, Any]) -> bytes:
         """
         Create a new entity instance.
         
@@ -112,7 +180,7 @@ class EntityBase(ABC):
             data: Dictionary of field values (excluding auto-generated fields)
         
         Returns:
-            The InstanceId of the created record (as string)
+            The InstanceId of the created record (as 16 raw bytes)
         """
         instance_id = self._generate_uuid()
         record = {
@@ -125,15 +193,49 @@ class EntityBase(ABC):
         
         self._write_record(record)
         return instance_id
-    
-    def update(self, instance_id: str, data: Dict[str, Any]) -> str:
+
+    async def create_async(self, data: Dict[str, Any]) -> bytes:
+        """
+        Async variant of create for use inside async HTTP handlers.
+
+        Uploads the record's part file without blocking the event loop, so
+        several creates can run concurrently via asyncio.gather. Bypasses
+        the buffered writer.
+
+        Args:
+            data: Dictionary of field values (excluding auto-generated fields)
+
+        Returns:
+            The InstanceId of the created record (as 16 raw bytes)
+        """
+        instance_id = self._generate_uuid()
+        record = {
+            "Id": instance_id,
+            "InstanceId": instance_id,
+            "CreatedDate": datetime.now(timezone.utc),
+            "IsCurrent": True,
+            **data
+        }
+
+        new_df = self._records_to_frame([record])
+        part_path = f"{self.entity_name}/part-{self._generate_uuid().hex()}.parquet"
+        await self._upload_to_adlfs_async(new_df, part_path)
+        mark_exists(self.directory_path)
+        invalidate_listing(self.directory_path)
+        await self._update_current_view_async(new_df)
+        return instance_id
+
+    def update(self, instance_id: bytes, data: Dict[str, Any]) -> bytes:
         """
         Update an existing instance by creating a new version.
-        
+
         Process:
-        1. Marks current version as IsCurrent = False
-        2. Creates new version with updated data and IsCurrent = True
-        
+        1. Verifies a current version exists for the instance
+        2. Appends a new version with updated data and IsCurrent = True
+
+        The previous version is not rewritten; it stops being current because
+        load_all resolves IsCurrent from the latest CreatedDate per InstanceId.
+
         Automatically generates:
         - Id: New UUIDv7
         - CreatedDate: Current timestamp
@@ -144,37 +246,29 @@ class EntityBase(ABC):
             data: Dictionary of updated field values
         
         Returns:
-            The new record Id (as string)
+            The new record Id (as 16 raw bytes)
         
         Raises:
             ValueError: If instance_id doesn't exist or has no current version
         """
-        # Load all data to modify
-        all_data = self.load_all().collect()
-        
-        # Find current version
-        current = all_data.filter(
-            (pl.col("InstanceId") == instance_id) & 
-            (pl.col("IsCurrent") == True)
+        # Find current version, keeping the filter on the LazyFrame so the
+        # parquet scan can prune on InstanceId instead of materializing
+        # the full history
+        current = (
+            self.load_all()
+            .filter(
+                (pl.col("InstanceId") == instance_id) &
+                pl.col("IsCurrent")
+            )
+            .collect()
         )
-        
+
         if current.height == 0:
             raise ValueError(
                 f"No current record found for InstanceId: {instance_id}"
             )
-        
-        # Mark current version as not current
-        updated_data = all_data.with_columns(
-            pl.when(
-                (pl.col("InstanceId") == instance_id) & 
-                (pl.col("IsCurrent") == True)
-            )
-            .then(False)
-            .otherwise(pl.col("IsCurrent"))
-            .alias("IsCurrent")
-        )
-        
-        # Create new version
+
+        # Create new version; its later CreatedDate supersedes the old one
         new_id = self._generate_uuid()
         new_record = {
             "Id": new_id,
@@ -183,51 +277,174 @@ class EntityBase(ABC):
             "IsCurrent": True,
             **data
         }
-        
-        # Append new record
-        new_df = pl.DataFrame([new_record], schema=self.schema)
-        combined = pl.concat([updated_data, new_df])
-        
-        # Write back
-        self._upload_to_adlfs(combined)
-        
+
+        self._write_record(new_record)
+
         return new_id
 
-    def _upload_to_adlfs(self, df):
-        file_client = get_file_client(self.file_path)
+    def _records_to_frame(self, records) -> pl.DataFrame:
+        """
+        Build a DataFrame from record dicts via column-oriented construction.
+
+        Handing Polars one list per column skips the row-to-column pivot it
+        performs for a list of dicts, and amortizes over batched records.
+        Missing keys become nulls, as with the row-oriented form.
+        """
+        return pl.DataFrame(
+            {name: [record.get(name) for record in records] for name in self.schema},
+            schema=self.schema
+        )
+
+    def _serialize_parquet(self, df) -> BytesIO:
+        # Sort so each row group covers a tight InstanceId range and keep
+        # row groups small, maximizing min/max pruning on instance lookups
+        df = df.sort(["InstanceId", "CreatedDate"])
         buffer = BytesIO()
-        df.write_parquet(buffer)
-        file_client.upload_data(buffer.getvalue(), overwrite=True)
-    
+        df.write_parquet(
+            buffer,
+            compression="zstd",
+            compression_level=1,
+            row_group_size=64_000
+        )
+        # Hand the SDK the rewound BytesIO itself: it streams via read(),
+        # avoiding the full copy getvalue() would make
+        buffer.seek(0)
+        return buffer
+
+    def _upload_to_adlfs(self, df, file_path):
+        file_client = get_file_client(file_path)
+        file_client.upload_data(self._serialize_parquet(df), overwrite=True)
+        mark_exists(file_path)
+
+    async def _upload_to_adlfs_async(self, df, file_path):
+        await upload_async(file_path, self._serialize_parquet(df))
+
     def _write_record(self, record: Dict[str, Any]):
         """
         Internal method to write a single record to storage.
-        
-        Appends to existing data or creates new file if none exists.
-        """
-        new_df = pl.DataFrame([record], schema=self.schema)
-
-        if check_exists(self.file_path):
-            # Append to existing data
-            existing = pl.read_parquet(self.full_url, storage_options=get_storage_options())
-            combined = pl.concat([existing, new_df])
-            self._upload_to_adlfs(combined)
-        else:
-            # Create new file
-            self._upload_to_adlfs(new_df)
-    
+
+        Writes the record as its own part file so the cost of a write is
+        independent of how much history already exists. With buffer_writes
+        enabled, the record is queued instead and a burst of writes is
+        collapsed into one upload.
+        """
+        if self.buffer_writes:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(record)
+            if (len(self._pending) >= self.BATCH_SIZE
+                    or time.monotonic() - self._pending_since >= self.FLUSH_AFTER_SECONDS):
+                self.flush()
+            return
+
+        self._write_part(self._records_to_frame([record]))
+
+    def flush(self):
+        """
+        Upload any buffered records as a single part file.
+
+        No-op when nothing is pending, so it is always safe to call before
+        reading or returning an HTTP response.
+        """
+        if not self._pending:
+            return
+        df = self._records_to_frame(self._pending)
+        self._pending = []
+        self._pending_since = None
+        self._write_part(df)
+
+    def compact(self):
+        """
+        Merge accumulated part files into a single sorted parquet.
+
+        The append-only write path leaves one small file per mutation;
+        compaction rewrites them as one file with tight InstanceId row
+        groups so file listings stay short and pruning stays effective.
+        The compacted file is uploaded before the old parts are deleted,
+        so concurrent readers never see missing rows (at worst a brief
+        window of duplicated ones).
+        """
+        if not check_directory_exists(self.directory_path):
+            return
+        part_paths = [
+            path for path in list_files(self.directory_path)
+            if self._is_part_file(path)
+        ]
+        if len(part_paths) <= 1:
+            logging.info(f"Nothing to compact for entity '{self.entity_name}'")
+            return
+
+        df = (
+            pl.scan_parquet(
+                [f"{self.storage_path}{path}" for path in part_paths],
+                storage_options=get_storage_options()
+            )
+            .collect(engine="streaming")
+        )
+        compacted_path = f"{self.entity_name}/compacted-{self._generate_uuid().hex()}.parquet"
+        self._upload_to_adlfs(df, compacted_path)
+        logging.info(
+            f"Compacted {len(part_paths)} files into {compacted_path} for entity '{self.entity_name}'"
+        )
+
+        for path in part_paths:
+            delete_file(path)
+
+    def _write_part(self, df: pl.DataFrame):
+        part_path = f"{self.entity_name}/part-{self._generate_uuid().hex()}.parquet"
+        self._upload_to_adlfs(df, part_path)
+        mark_exists(self.directory_path)
+        invalidate_listing(self.directory_path)
+        self._update_current_view(df)
+
+    def _build_current_view(self, new_df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Merge newly written rows into the current-view contents.
+
+        Rows in the existing view for the same InstanceIds are replaced by
+        the new versions; rows for other instances are kept. Cost is
+        O(live rows), not O(total versions).
+        """
+        # Ask storage directly rather than the exists cache: a stale
+        # negative here would rebuild the view from new_df alone and
+        # silently drop every other instance's current row
+        if not get_file_client(self.current_view_path).exists():
+            return new_df
+        existing = (
+            pl.scan_parquet(
+                f"{self.storage_path}{self.current_view_path}",
+                storage_options=get_storage_options()
+            )
+            .filter(~pl.col("InstanceId").is_in(new_df["InstanceId"].to_list()))
+            .collect()
+        )
+        return pl.concat([existing, new_df], how="vertical", rechunk=False)
+
+    def _update_current_view(self, new_df: pl.DataFrame):
+        self._upload_to_adlfs(self._build_current_view(new_df), self.current_view_path)
+
+    async def _update_current_view_async(self, new_df: pl.DataFrame):
+        await self._upload_to_adlfs_async(self._build_current_view(new_df), self.current_view_path)
+
+    @staticmethod
+    def _is_part_file(path) -> bool:
+        """Part files hold history rows; underscore-prefixed files (like
+        the _current view) are auxiliary and excluded from history scans."""
+        name = path.rsplit("/", 1)[-1]
+        return name.endswith(".parquet") and not name.startswith("_")
+
     @staticmethod
-    def _generate_uuid() -> str:
-        """Generate a UUIDv7 (time-ordered UUID)."""
+    def _generate_uuid() -> bytes:
+        """Generate a UUIDv7 (time-ordered UUID) as its raw 16 bytes."""
         # Note: uuid7() requires Python 3.13+
         # For older versions, use uuid4() or a third-party library
         try:
-            return str(uuid.uuid7())
+            return uuid.uuid7().bytes
         except AttributeError:
             # Fallback for Python < 3.13
-            return str(uuid.uuid4())
+            return uuid.uuid4().bytes
     
-    def get_instance_history(self, instance_id: str) -> pl.DataFrame:
+    def get_instance_history(self, instance_id: bytes) -> pl.DataFrame:
         """
         Get all versions of a specific instance, ordered by creation date.
         
@@ -1,5 +1,12 @@
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.filedatalake import DataLakeServiceClient
+from azure.storage.filedatalake.aio import DataLakeServiceClient as AsyncDataLakeServiceClient
 import os
+import time
+import requests
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from threading import Lock
 from utils import is_prod
 import logging
 
@@ -7,30 +14,123 @@ _storage_account = "fooddiarystorage"
 _storage_key = os.environ.get("FOODDIARY_STORAGE_ACCOUNT_KEY", default=None)
 _service_client = None
 _file_system_client = None
-_file_clients = {}
+_async_service_client = None
+_async_file_system_client = None
+
+# File clients are cached in lock-guarded LRUs: the Functions host can run
+# handlers concurrently, and an unbounded dict would grow with every path
+# ever touched
+_FILE_CLIENT_CACHE_SIZE = 256
+_file_clients = OrderedDict()
+_file_clients_lock = Lock()
+_async_file_clients = OrderedDict()
+_async_file_clients_lock = Lock()
+
+def _get_cached_file_client(cache, lock, file_path, factory):
+    with lock:
+        client = cache.get(file_path)
+        if client is not None:
+            cache.move_to_end(file_path)
+            return client
+    client = factory(file_path)
+    with lock:
+        # Double-checked: another thread may have inserted while we built
+        existing = cache.get(file_path)
+        if existing is not None:
+            cache.move_to_end(file_path)
+            return existing
+        cache[file_path] = client
+        while len(cache) > _FILE_CLIENT_CACHE_SIZE:
+            cache.popitem(last=False)
+    return client
+_exists_cache = {}
+
+# Caches expire after a finite default TTL: other instances mutate the same
+# container (e.g. the compaction timer deletes part files), so an entry is
+# only trustworthy for a short window. The env vars override the defaults.
+_DEFAULT_EXISTS_CACHE_TTL_SECONDS = 30.0
+_DEFAULT_LISTING_CACHE_TTL_SECONDS = 30.0
+
+def _exists_cache_ttl():
+    ttl = os.environ.get("FOODDIARY_EXISTS_CACHE_TTL_SECONDS", default=None)
+    return float(ttl) if ttl is not None else _DEFAULT_EXISTS_CACHE_TTL_SECONDS
+
+def _get_cached_exists(path):
+    if path not in _exists_cache:
+        return None
+    result, cached_at = _exists_cache[path]
+    ttl = _exists_cache_ttl()
+    if ttl is not None and time.monotonic() - cached_at > ttl:
+        # pop rather than del: a concurrent invocation may have already
+        # expired (or refreshed) this entry
+        _exists_cache.pop(path, None)
+        return None
+    return result
+
+def mark_exists(path):
+    _exists_cache[path] = (True, time.monotonic())
+
+def invalidate_exists(path):
+    _exists_cache.pop(path, None)
+
+_listing_cache = {}
+
+def _listing_cache_ttl():
+    ttl = os.environ.get("FOODDIARY_LISTING_CACHE_TTL_SECONDS", default=None)
+    return float(ttl) if ttl is not None else _DEFAULT_LISTING_CACHE_TTL_SECONDS
+
+def invalidate_listing(directory_path):
+    _listing_cache.pop(directory_path, None)
 
 def get_container_name() -> str:
     return "prod" if is_prod() else "test"
 
+_storage_options = None
+
 def get_storage_options():
-    global _storage_account, _storage_key
+    global _storage_account, _storage_key, _storage_options
     if _storage_key is None:
         raise ValueError("Storage account key is not set in environment variables.")
-    return {
-        "account_name": _storage_account,
-        "account_key": _storage_key
-    }
+    if _storage_options is None:
+        # Built once and shared; treat the returned dict as immutable
+        _storage_options = {
+            "account_name": _storage_account,
+            "account_key": _storage_key
+        }
+    return _storage_options
 
 def get_adlfs_path() -> str:
     return f"az://{get_container_name()}/"
 
+_transport = None
+
+def _get_transport():
+    # Shared pooled transport so warm invocations reuse TLS connections
+    # instead of paying a handshake per request
+    global _transport
+    if _transport is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        session.mount("https://", adapter)
+        _transport = RequestsTransport(
+            session=session,
+            session_owner=False,
+            connection_timeout=10,
+            read_timeout=60
+        )
+    return _transport
+
 def get_service_client():
     global _storage_account, _storage_key, _service_client
     if _storage_key is None:
         raise ValueError("Storage account key is not set in environment variables.")
     if _service_client is None:
         account_url = f"https://{_storage_account}.dfs.core.windows.net"
-        _service_client = DataLakeServiceClient(account_url=account_url, credential=_storage_key)
+        _service_client = DataLakeServiceClient(
+            account_url=account_url,
+            credential=_storage_key,
+            transport=_get_transport()
+        )
     return _service_client
 
 def get_file_system_client():
@@ -43,18 +143,100 @@ def get_file_system_client():
     return _file_system_client
 
 def get_file_client(file_path):
-    if file_path not in _file_clients:
-        file_system_client = get_file_system_client()
-        _file_clients[file_path] = file_system_client.get_file_client(file_path)
-    return _file_clients[file_path]
+    return _get_cached_file_client(
+        _file_clients,
+        _file_clients_lock,
+        file_path,
+        lambda path: get_file_system_client().get_file_client(path)
+    )
+
+def get_async_service_client():
+    global _storage_account, _storage_key, _async_service_client
+    if _storage_key is None:
+        raise ValueError("Storage account key is not set in environment variables.")
+    if _async_service_client is None:
+        account_url = f"https://{_storage_account}.dfs.core.windows.net"
+        _async_service_client = AsyncDataLakeServiceClient(account_url=account_url, credential=_storage_key)
+    return _async_service_client
+
+def get_async_file_system_client():
+    global _async_file_system_client
+    if _async_file_system_client is None:
+        container_name = get_container_name()
+        service_client = get_async_service_client()
+        _async_file_system_client = service_client.get_file_system_client(file_system=container_name)
+        logging.info(f"Async file system client created for container: {container_name}")
+    return _async_file_system_client
+
+def get_async_file_client(file_path):
+    return _get_cached_file_client(
+        _async_file_clients,
+        _async_file_clients_lock,
+        file_path,
+        lambda path: get_async_file_system_client().get_file_client(path)
+    )
+
+async def upload_async(file_path, data):
+    file_client = get_async_file_client(file_path)
+    await file_client.upload_data(data, overwrite=True)
+    mark_exists(file_path)
 
 def check_exists(file_path) -> bool:
+    cached = _get_cached_exists(file_path)
+    if cached is not None:
+        logging.info(f"File existence cache hit for {file_path}: {cached}")
+        return cached
     logging.info(f"Checking existence of file: {file_path}")
     file_client = get_file_client(file_path)
     result = file_client.exists()
     logging.info(f"File exists: {result}")
+    _exists_cache[file_path] = (result, time.monotonic())
     return result
 
+def check_directory_exists(directory_path) -> bool:
+    cached = _get_cached_exists(directory_path)
+    if cached is not None:
+        logging.info(f"Directory existence cache hit for {directory_path}: {cached}")
+        return cached
+    logging.info(f"Checking existence of directory: {directory_path}")
+    file_system_client = get_file_system_client()
+    result = file_system_client.get_directory_client(directory_path).exists()
+    logging.info(f"Directory exists: {result}")
+    _exists_cache[directory_path] = (result, time.monotonic())
+    return result
+
+def list_files(directory_path):
+    logging.info(f"Listing files under: {directory_path}")
+    file_system_client = get_file_system_client()
+    return [
+        path.name
+        for path in file_system_client.get_paths(path=directory_path)
+        if not path.is_directory
+    ]
+
+def list_files_cached(directory_path):
+    if directory_path in _listing_cache:
+        listing, cached_at = _listing_cache[directory_path]
+        ttl = _listing_cache_ttl()
+        if ttl is None or time.monotonic() - cached_at <= ttl:
+            logging.info(f"Listing cache hit for {directory_path}")
+            return listing
+        _listing_cache.pop(directory_path, None)
+    listing = list_files(directory_path)
+    _listing_cache[directory_path] = (listing, time.monotonic())
+    return listing
+
+def delete_file(file_path):
+    logging.info(f"Deleting file: {file_path}")
+    file_client = get_file_client(file_path)
+    file_client.delete_file()
+    invalidate_exists(file_path)
+    invalidate_listing(os.path.dirname(file_path))
+    with _file_clients_lock:
+        _file_clients.pop(file_path, None)
+    with _async_file_clients_lock:
+        _async_file_clients.pop(file_path, None)
+
 def create_path_to(file_path):
     logging.info(f"Creating path to file: {file_path}")
     file_system_client = get_file_system_client()
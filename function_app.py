@@ -1,32 +1,46 @@
 import azure.functions as func
 import logging
-from data.interfaces.blob import get_adlfs_path, get_file_client
+from data.interfaces.blob import upload_async
 from data.entities.diary_entry import DiaryEntries
 from datetime import datetime, timezone
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
+# Constructed once so warm containers reuse it across invocations
+DIARY = DiaryEntries()
+
 @app.function_name(name="debug_endpoint")
 @app.route(route="debug")
-def main(req: func.HttpRequest) -> str:
+async def debug(req: func.HttpRequest) -> str:
     msg = "The debug function endpoint executed successfully; "
-    diary = DiaryEntries()
-    instance_id = diary.create({
+    instance_id = await DIARY.create_async({
         "UserId": "user-123",
         "Food": "BEANS!",
         "ConsumedAt": datetime.now(timezone.utc),
         "Notes": "Breakfast"
     })
 
-    return msg + '\n' + str(diary.load_all().collect())
+    # Select only the columns the response needs and collect with the
+    # streaming engine so projection/predicate pushdown reach the scan
+    entries = (
+        DIARY.load_current()
+        .select(["Id", "Food", "ConsumedAt"])
+        .collect(engine="streaming")
+    )
+    return msg + '\n' + str(entries)
+
+@app.function_name(name="compact_entities")
+@app.schedule(schedule="0 */15 * * * *", arg_name="timer")
+def compact_entities(timer: func.TimerRequest) -> None:
+    logging.info("Running scheduled entity compaction")
+    DIARY.compact()
 
 @app.function_name(name="debug_write_endpoint")
 @app.route(route="debug_write")
-def main(req: func.HttpRequest) -> str:
+async def debug_write(req: func.HttpRequest) -> str:
     file_name = "testfile.txt"
     if "msg" not in req.params:
         return "Please pass a 'msg' parameter in the query string"
     msg = req.params.get("msg")
-    file_client = get_file_client(file_name)
-    file_client.upload_data(data=msg, overwrite=True)
+    await upload_async(file_name, msg)
     return f"Successfully wrote:\n{msg}\nto {file_name}"
@@ -0,0 +1,102 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+import data.entities.entity_base as entity_base
+from data.entities.diary_entry import DiaryEntries
+
+
+class LocalFileClient:
+    """Stub file client that writes to the local filesystem."""
+
+    def __init__(self, root, file_path):
+        self.path = os.path.join(root, file_path)
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def upload_data(self, data, overwrite=False):
+        # Mirror the SDK's type dispatch: bytes, str or file-like only
+        if isinstance(data, str):
+            payload = data.encode("utf-8")
+        elif isinstance(data, bytes):
+            payload = data
+        elif hasattr(data, "read"):
+            payload = data.read()
+        else:
+            raise TypeError(f"Unsupported data type: {type(data)}")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(payload)
+
+
+@pytest.fixture
+def diary(tmp_path, monkeypatch):
+    """A DiaryEntries instance backed by a stubbed local blob layer."""
+    root = str(tmp_path)
+
+    def list_local(directory_path):
+        full = os.path.join(root, directory_path)
+        return [f"{directory_path}/{name}" for name in sorted(os.listdir(full))]
+
+    monkeypatch.setattr(entity_base, "get_adlfs_path", lambda: f"{root}/")
+    monkeypatch.setattr(entity_base, "get_storage_options", lambda: None)
+    monkeypatch.setattr(
+        entity_base, "check_exists",
+        lambda path: os.path.isfile(os.path.join(root, path))
+    )
+    monkeypatch.setattr(
+        entity_base, "check_directory_exists",
+        lambda path: os.path.isdir(os.path.join(root, path))
+    )
+    monkeypatch.setattr(
+        entity_base, "get_file_client",
+        lambda path: LocalFileClient(root, path)
+    )
+    monkeypatch.setattr(entity_base, "list_files", list_local)
+    monkeypatch.setattr(entity_base, "list_files_cached", list_local)
+    monkeypatch.setattr(
+        entity_base, "delete_file",
+        lambda path: os.remove(os.path.join(root, path))
+    )
+    monkeypatch.setattr(entity_base, "mark_exists", lambda path: None)
+    monkeypatch.setattr(entity_base, "invalidate_listing", lambda path: None)
+
+    return DiaryEntries()
+
+
+def _entry(food):
+    return {
+        "UserId": "user-123",
+        "Food": food,
+        "ConsumedAt": datetime.now(timezone.utc),
+        "Notes": None
+    }
+
+
+def test_create_load_current_update_roundtrip(diary):
+    instance_id = diary.create(_entry("BEANS!"))
+
+    current = diary.load_current().collect()
+    assert current.height == 1
+    assert current["Food"][0] == "BEANS!"
+    assert current["InstanceId"][0] == instance_id
+
+    new_id = diary.update(instance_id, _entry("TOAST"))
+    assert new_id != instance_id
+
+    current = diary.load_current().collect()
+    assert current.height == 1
+    assert current["Food"][0] == "TOAST"
+
+    # Full history keeps both versions, with IsCurrent resolved at scan time
+    history = diary.get_instance_history(instance_id)
+    assert history.height == 2
+    assert history["IsCurrent"].to_list() == [False, True]
+
+
+def test_update_unknown_instance_raises(diary):
+    diary.create(_entry("BEANS!"))
+    with pytest.raises(ValueError):
+        diary.update(b"\x00" * 16, _entry("TOAST"))